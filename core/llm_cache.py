@@ -0,0 +1,64 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def make_cache_key(*parts: str) -> str:
+    """将若干字符串片段拼接后计算 SHA-256，作为缓存键。"""
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def normalize_query(query: str) -> str:
+    """规范化查询文本（小写、合并空白），使仅有大小写或空白差异的查询命中同一缓存。"""
+    return " ".join(query.lower().split())
+
+
+class TTLCache:
+    """
+    带过期时间的 LRU 内存缓存。
+    超出容量时淘汰最久未使用的条目；ttl_seconds <= 0 时缓存关闭。
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # key -> (过期时间, 值)
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        # 命中/未命中计数，便于观察缓存效果
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取未过期的值，命中时将其标记为最近使用。"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        """写入缓存，超出容量时淘汰最久未使用的条目。"""
+        if not self.enabled:
+            return
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,14 +1,38 @@
 # main.py
 import asyncio
-import json
+import contextlib
+import math
+import os
+import random
 import httpx
 import re
-import markdown
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from bs4 import BeautifulSoup
-from typing import List, Dict, Optional, Any, AsyncGenerator, Union
+from bs4 import UnicodeDammit
+
+try:
+    # selectolax 的 lexbor 后端基于 C 实现，正文提取比 BeautifulSoup 快得多
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:  # 未安装时回退到 BeautifulSoup
+    HTMLParser = None
+from typing import (
+    List,
+    Dict,
+    Optional,
+    Any,
+    AsyncGenerator,
+    FrozenSet,
+    Tuple,
+    Union,
+)
 
 # 导入 AstrBot API
-from astrbot.api.event import filter, AstrMessageEvent, MessageEventResult
+from astrbot.api.event import (
+    filter,
+    AstrMessageEvent,
+    MessageChain,
+    MessageEventResult,
+)
 from astrbot.api.star import Context, Star, register
 from astrbot.api import logger, AstrBotConfig
 from astrbot.api.provider import Provider, LLMResponse
@@ -19,13 +43,14 @@ from .config import (
     DEFAULT_CONFIG,
     SUPPORTED_OUTPUT_FORMATS,
     DEFAULT_HEADERS,
-    HTML_REPORT_TEMPLATE,
 )
 from .search_engine_lib.models import SearchQuery, SearchResponse, SearchResultItem
-from .search_engine_lib.base import BaseSearchEngine
+from .search_engine_lib.base import BaseSearchEngine, json_loads
 from .search_engine_lib import initialize, list_engines, get_engine
+from .search_engine_lib import close as close_engines
 from .url_resolver import URLResolverManager
 from .output_format import OutputFormatManager
+from .core.llm_cache import TTLCache, make_cache_key, normalize_query
 
 from .core.constants import (
     PLUGIN_NAME,
@@ -39,7 +64,140 @@ from .core.constants import (
 MAX_CONTENT_LENGTH = DEFAULT_CONFIG["max_content_length"]
 MAX_SELECTED_LINKS = DEFAULT_CONFIG["max_selected_links"]
 FETCH_TIMEOUT = DEFAULT_CONFIG["fetch_timeout"]
+# 单个网页最多读取的原始 HTML 字节数，超出部分直接丢弃
+MAX_HTML_BYTES = 2 * 1024 * 1024
+# 网页抓取的重试策略：仅对超时、网络错误和以下临时性状态码重试，
+# 退避时间按指数增长并封顶，再叠加随机抖动，避免并发重试同时打到目标站点
+FETCH_MAX_ATTEMPTS = 3
+FETCH_RETRY_BASE_DELAY = 0.5
+FETCH_RETRY_MAX_DELAY = 5.0
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
 HEADERS = DEFAULT_HEADERS
+# LLM 返回内容前后可能包裹的 markdown 代码块标记
+JSON_FENCE_START_RE = re.compile(r"^```json\s*", re.IGNORECASE)
+JSON_FENCE_END_RE = re.compile(r"\s*```$")
+# 连续空白（含换行），清理网页正文时折叠为单个空格
+WHITESPACE_RE = re.compile(r"\s+")
+# 正文提取时移除的非内容标签
+NON_CONTENT_TAGS = ["script", "style", "noscript", "nav", "footer", "header", "aside"]
+# 不影响页面内容的跟踪参数，规范化 URL 时去除
+TRACKING_PARAMS = frozenset({"fbclid", "gclid", "msclkid", "spm"})
+# 关键词预筛选：按字母数字与汉字切分词元；汉字串没有空格分词，改用相邻二字组
+WORD_TOKEN_RE = re.compile(r"\w+")
+CJK_CHAR_RE = re.compile(r"[\u4e00-\u9fff]")
+# 只检查正文开头部分，足以判断主题是否相关
+KEYWORD_PREFILTER_CHARS = 2000
+# 计算正文指纹时只取开头部分，转载页末尾附加的版权声明、推荐阅读等不影响指纹
+CONTENT_FINGERPRINT_CHARS = 2048
+
+
+def _normalize_url(url: str) -> str:
+    """
+    规范化 URL 用作抓取去重的键：协议与主机名小写、去掉片段与末尾斜杠、
+    去掉 utm_* 等跟踪参数。仅用于比较，实际请求仍使用原始 URL。
+    """
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    query = urlencode(
+        [
+            (k, v)
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if not k.startswith("utm_") and k not in TRACKING_PARAMS
+        ]
+    )
+    return urlunsplit(
+        (
+            parts.scheme.lower(),
+            parts.netloc.lower(),
+            parts.path.rstrip("/") or "/",
+            query,
+            "",
+        )
+    )
+
+
+def _keyword_tokens(text: str) -> FrozenSet[str]:
+    """将文本切分为用于关键词匹配的词元集合（小写单词，汉字串按二字组切分）"""
+    tokens = set()
+    for word in WORD_TOKEN_RE.findall(text.lower()):
+        if CJK_CHAR_RE.search(word):
+            tokens.update(word[i : i + 2] for i in range(len(word) - 1))
+        elif len(word) > 1:
+            tokens.add(word)
+    return frozenset(tokens)
+
+
+def _keyword_overlap(term_tokens: Tuple[FrozenSet[str], ...], content: str) -> float:
+    """
+    计算正文开头部分与各搜索词的关键词重合比例 (0~1)，取最匹配的单个搜索词。
+    按单个搜索词计分，分数不会因阶段一生成的搜索词增多而被稀释。
+    """
+    if not term_tokens:
+        return 1.0
+    content_tokens = _keyword_tokens(content[:KEYWORD_PREFILTER_CHARS])
+    return max(len(tokens & content_tokens) / len(tokens) for tokens in term_tokens)
+
+
+def _content_fingerprint(content: str) -> str:
+    """
+    正文指纹：只保留正文开头部分的小写单词/汉字串，忽略标点与空白差异，
+    使镜像站、转载页等正文基本一致的页面得到相同的指纹。
+    """
+    return " ".join(
+        WORD_TOKEN_RE.findall(content[:CONTENT_FINGERPRINT_CHARS].lower())
+    )
+
+
+def _selectolax_text(html_content: bytes, encoding: Optional[str]) -> str:
+    """使用 selectolax 解析 HTML 并提取正文文本"""
+    # lexbor 总是按 UTF-8 解读字节，需要先自行解码。UnicodeDammit 依次尝试
+    # 响应头字符集、BOM 与 meta 声明的字符集，均没有时再根据字节内容探测，
+    # 与 BeautifulSoup 路径的编码处理一致（未声明字符集的 GBK 页面等）
+    html = UnicodeDammit(
+        html_content, [encoding] if encoding else [], is_html=True
+    ).unicode_markup
+    if html is None:
+        html = html_content.decode("utf-8", errors="replace")
+    tree = HTMLParser(html)
+    # 移除 script、style 等非正文节点（连同其内容）
+    tree.strip_tags(NON_CONTENT_TAGS)
+    # 优先尝试获取 article 标签
+    node = tree.css_first("article") or tree.css_first("main") or tree.body
+    if node is None:
+        node = tree.root
+    return node.text(separator=" ", strip=True) if node is not None else ""
+
+
+def _bs4_text(html_content: bytes, encoding: Optional[str]) -> str:
+    """使用 BeautifulSoup 解析 HTML 并提取正文文本（未安装 selectolax 时使用）"""
+    soup = BeautifulSoup(html_content, "lxml", from_encoding=encoding)
+    # 移除 script 和 style
+    for tag in soup(NON_CONTENT_TAGS):
+        tag.decompose()
+
+    # 优先尝试获取 article 标签
+    main_content_tag = soup.find("article") or soup.find("main") or soup.body or soup
+
+    # 直接从 DOM 提取文本，块之间以空格分隔；
+    # 不再经过 HTML -> markdown -> 第二次 BeautifulSoup 解析的往返
+    return main_content_tag.get_text(" ", strip=True)
+
+
+def _extract_main_text(html_content: bytes, encoding: Optional[str] = None) -> str:
+    """
+    从 HTML 中提取正文纯文本，并清理空白、截断到 MAX_CONTENT_LENGTH。
+    纯 CPU 计算，不访问插件状态，由调用方放到线程池中执行以免阻塞事件循环。
+    encoding 为响应头声明的字符集，缺省时由解析器根据 meta 标签等自动探测。
+    """
+    if HTMLParser is not None:
+        text = _selectolax_text(html_content, encoding)
+    else:
+        text = _bs4_text(html_content, encoding)
+    # 清理多余空白和换行
+    cleaned_text = WHITESPACE_RE.sub(" ", text).strip()
+    return cleaned_text[:MAX_CONTENT_LENGTH]
 
 
 @register(
@@ -59,22 +217,63 @@ class DeepResearchPlugin(Star):
         self.context = context
         self.config = config
         # 初始化异步 HTTP 客户端
+        # 整个插件共用这一个客户端（网页抓取与 URL 解析），显式设置连接池上限，
+        # 保留足够的空闲长连接以复用 TCP/TLS 握手
         self.client = httpx.AsyncClient(
             timeout=FETCH_TIMEOUT,
             http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
             follow_redirects=True,
             verify=False,
             headers=HEADERS,
         )
         self.search_engine_initialized = False
         self.available_engine_names: List[str] = []
+        # 正在进行中的搜索请求，相同 (引擎, 搜索词, 数量) 的并发请求共享同一个 Future
+        self._inflight_searches: Dict[tuple, asyncio.Future] = {}
+        # 正在进行中的网页抓取，键为规范化后的 URL
+        self._inflight_fetches: Dict[str, asyncio.Future] = {}
+        # 正在进行中的单篇总结，键为正文指纹缓存键；镜像页面同时到达时只总结一次
+        self._inflight_summaries: Dict[str, asyncio.Future] = {}
         self.max_count: int = self.config.get("max_search_results_per_term", 6)
         self.max_terms: int = self.config.get("max_terms_to_search", 3)
+        # 阶段三按外部服务分别限制并发：网页抓取与 LLM 总结。
+        # 至少为 1，配置为 0 会让阶段三永久阻塞
+        self._fetch_semaphore = asyncio.Semaphore(
+            max(1, self.config.get("max_concurrent_fetches", 10))
+        )
+        self._llm_semaphore = asyncio.Semaphore(
+            max(1, self.config.get("max_concurrent_llm_calls", 5))
+        )
+        self.llm_batch_size: int = max(1, self.config.get("llm_batch_size", 1))
+        # 关键词重合比例低于该阈值的网页不送入 LLM 总结，默认 0 即关闭
+        self.keyword_prefilter_threshold: float = self.config.get(
+            "keyword_prefilter_threshold", 0
+        )
+        # 摘要缓存：相同模型、查询与 URL 在有效期内直接复用摘要，跳过抓取与 LLM 调用；
+        # 同时按正文指纹存一份，内容重复的不同 URL 也能复用
+        self.summary_cache = TTLCache(
+            max_size=512, ttl_seconds=self.config.get("summary_cache_ttl", 3600)
+        )
+        # 默认输出格式在插件生命周期内不变，初始化时读取一次
+        self.default_output_format: str = self.config.get(
+            "default_output_format", "image"
+        )
+        # LLM 响应缓存：模型、系统提示词与提示词完全相同的请求直接复用上次的回复
+        self.llm_cache = TTLCache(
+            max_size=512, ttl_seconds=self.config.get("llm_cache_ttl", 3600)
+        )
         engine_config = self.config.get("engine_config", {})
 
         self.output_manager = OutputFormatManager()
+        # 各输出格式对应的结果消息构造方法，未列出的格式按纯文本发送
+        self._report_result_builders = {
+            "image": self._image_report_result,
+            "html": self._html_report_result,
+        }
 
-        asyncio.create_task(self.initialize_engine(engine_config))
+        # 保存初始化任务的引用，避免任务被垃圾回收，并可在 terminate 时取消
+        self._init_task = asyncio.create_task(self.initialize_engine(engine_config))
         logger.info("DeepResearchPlugin 初始化完成，HTTP 客户端已创建。")
 
     async def initialize_engine(self, engine_config):
@@ -106,9 +305,14 @@ class DeepResearchPlugin(Star):
         """
         插件终止，清理资源
         """
+        if not self._init_task.done():
+            self._init_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._init_task
+        await close_engines()
         logger.info("DeepResearchPlugin 正在关闭 HTTP Client...")
         # 必须显式关闭长期存在的 client 实例
-        if hasattr(self, "client") and self.client and not self.client.is_closed:
+        if not self.client.is_closed:
             try:
                 await self.client.aclose()
                 logger.info("DeepResearchPlugin HTTP Client 已关闭。")
@@ -122,8 +326,18 @@ class DeepResearchPlugin(Star):
         prompt: str,
         system_prompt: str = "",
         max_retries: int = 3,
+        cache_key: Optional[str] = None,
     ) -> Optional[str]:
-        """封装 LLM 调用，带重试和速率限制，返回文本内容或 None"""
+        """
+        封装 LLM 调用，带重试和速率限制，返回文本内容或 None。
+        传入 cache_key 时先查 LLM 响应缓存；本函数不写缓存，
+        由调用方在响应解析、校验通过后写入，避免无效响应被缓存后反复返回。
+        """
+        if cache_key is not None:
+            cached = self.llm_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("LLM 响应缓存命中，跳过本次调用。")
+                return cached
         for attempt in range(max_retries):
             try:
                 # 调用 AstrBot 提供的 LLM 接口
@@ -142,8 +356,8 @@ class DeepResearchPlugin(Star):
                 ):
                     # 尝试清理 JSON 字符串前后的 markdown 标记
                     content = llm_response.completion_text.strip()
-                    content = re.sub(r"^```json\s*", "", content, flags=re.IGNORECASE)
-                    content = re.sub(r"\s*```$", "", content, flags=re.IGNORECASE)
+                    content = JSON_FENCE_START_RE.sub("", content)
+                    content = JSON_FENCE_END_RE.sub("", content)
                     return content
                 else:
                     logger.warning(f"LLM 调用未返回有效助手消息: {llm_response}")
@@ -156,9 +370,11 @@ class DeepResearchPlugin(Star):
                 if "rate" in error_msg or "429" in error_msg or "quota" in error_msg:
                     if attempt < max_retries - 1:
                         # 指数退避延迟
-                        delay = (2**attempt) * 15  # 15秒, 30秒, 60秒
+                        # 叠加随机抖动，避免并发调用在同一时刻集中重试
+                        # 约15秒, 30秒, 60秒
+                        delay = (2**attempt) * 15 + random.uniform(0, 1)
                         logger.warning(
-                            f"LLM API速率限制，等待 {delay} 秒后重试 (尝试 {attempt + 1}/{max_retries})"
+                            f"LLM API速率限制，等待 {delay:.1f} 秒后重试 (尝试 {attempt + 1}/{max_retries})"
                         )
                         await asyncio.sleep(delay)
                         continue
@@ -189,24 +405,35 @@ class DeepResearchPlugin(Star):
             "search_queries": ["结合以上所有信息，生成 3-5 个用于搜索引擎的高质量搜索关键词短语列表"]
         }
         """
-        response_text = await self._call_llm(provider, query, system_prompt)
+        cache_key = self._llm_cache_key(provider, system_prompt, query)
+        response_text = await self._call_llm(
+            provider, query, system_prompt, cache_key=cache_key
+        )
         if not response_text:
             return None
         try:
-            parsed_data = json.loads(response_text)
-            # 将所有问题和搜索词合并，用于后续搜索
-            all_search_terms = set()
-            all_search_terms.add(query)
-            all_search_terms.update(parsed_data.get("sub_questions", []))
-            all_search_terms.update(parsed_data.get("sub_topics", []))
-            all_search_terms.update(parsed_data.get("expansion_questions", []))
-            all_search_terms.update(parsed_data.get("search_queries", []))
+            parsed_data = json_loads(response_text)
+            if not isinstance(parsed_data, dict):
+                raise ValueError("LLM did not return a JSON object")
+            # 将所有问题和搜索词合并，用于后续搜索。
+            # dict.fromkeys 去重且保持插入顺序，原始问题始终排在首位，
+            # 后续按 max_terms 截取时结果是确定的
+            all_search_terms = dict.fromkeys([query])
+            for field in (
+                "sub_questions",
+                "sub_topics",
+                "expansion_questions",
+                "search_queries",
+            ):
+                all_search_terms.update(dict.fromkeys(parsed_data.get(field, [])))
             parsed_data["all_search_terms"] = list(all_search_terms)
+            if cache_key is not None:
+                self.llm_cache.set(cache_key, response_text)
             logger.info(
                 f"阶段一：查询解析成功。生成搜索词 {len(parsed_data['all_search_terms'])} 个。"
             )
             return parsed_data
-        except json.JSONDecodeError:
+        except ValueError:
             logger.error(f"阶段一：LLM 返回的 JSON 解析失败: {response_text[:200]}...")
             return None
 
@@ -215,13 +442,36 @@ class DeepResearchPlugin(Star):
     async def _run_single_search(
         self, engine: BaseSearchEngine, term: str, count: int
     ) -> List[SearchResultItem]:
-        """使用指定引擎和搜索词执行一次搜索，并处理异常"""
+        """使用指定引擎和搜索词执行一次搜索，并处理异常。
+        相同的并发请求会被合并，只向搜索引擎发起一次请求。"""
         if not term:
             return []
+        key = (engine.name, term, count)
+        inflight = self._inflight_searches.get(key)
+        if inflight is not None:
+            logger.debug(f"复用进行中的搜索: '{engine.name}' / '{term}'")
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_searches[key] = future
+        try:
+            results = await self._do_single_search(engine, term, count)
+            future.set_result(results)
+            return results
+        finally:
+            if not future.done():
+                future.set_result([])
+            self._inflight_searches.pop(key, None)
+
+    async def _do_single_search(
+        self, engine: BaseSearchEngine, term: str, count: int
+    ) -> List[SearchResultItem]:
+        """实际执行单次搜索"""
         logger.info(f"使用引擎 '{engine.name}' 搜索: '{term}' (count={count})")
         try:
             query_obj = SearchQuery(query=term, count=count)
-            response: SearchResponse = await engine.search(query_obj)
+            async with engine.semaphore:
+                response: SearchResponse = await engine.search(query_obj)
             logger.debug(f"搜索 '{term}' 返回 {len(response.results)} 条结果。")
             return response.results
         except Exception as e:
@@ -231,21 +481,29 @@ class DeepResearchPlugin(Star):
             return []
 
     # ----------------------------------
-    async def _search_web(self, search_terms: List[str]) -> List[Dict[str, str]]:
+    async def _search_web(
+        self, search_terms: List[str]
+    ) -> Dict[str, Dict[str, str]]:
         """
         阶段二：多源信息检索
         使用 search_engine_lib 中【所有可用引擎】并发搜索多个关键词，并合并、去重、格式化结果。
+        返回以 URL 为键的字典（保持首次出现的顺序），供后续阶段直接按 URL 查找。
         """
+        # 引擎在后台任务中初始化，插件刚加载时发起的研究需等待其完成，
+        # 而不是直接判定为不可用。shield 防止请求取消时连带取消初始化
+        if not self._init_task.done():
+            logger.info("阶段二：搜索引擎仍在初始化，等待完成...")
+            await asyncio.shield(self._init_task)
         # 检查初始化状态和引擎列表
         if not self.search_engine_initialized or not self.available_engine_names:
             logger.error(
                 "阶段二：search_engine_lib 未初始化、不可用，或没有找到任何可用引擎，无法执行搜索。"
             )
-            return []
+            return {}
 
         if not search_terms:
             logger.warning("阶段二：没有提供搜索词。")
-            return []
+            return {}
         # 获取所有可用的引擎实例
         engines: List[BaseSearchEngine] = []
         for name in self.available_engine_names:
@@ -261,7 +519,7 @@ class DeepResearchPlugin(Star):
 
         if not engines:
             logger.error("阶段二：无法获取任何有效的搜索引擎实例。")
-            return []
+            return {}
         # 限制实际用于搜索的词条数量
         terms_to_search = [term for term in search_terms if term][: self.max_terms]
 
@@ -282,9 +540,8 @@ class DeepResearchPlugin(Star):
         all_results_nested: List[
             Union[List[SearchResultItem], Exception]
         ] = await asyncio.gather(*tasks, return_exceptions=True)
-        # 展平结果列表，过滤掉异常，并转换格式 + 去重
-        formatted_results: List[Dict[str, str]] = []
-        seen_urls = set()
+        # 展平结果列表，过滤掉异常，并转换格式 + 按 URL 去重
+        formatted_results: Dict[str, Dict[str, str]] = {}
         total_items_found = 0
 
         for result_batch in all_results_nested:
@@ -292,15 +549,12 @@ class DeepResearchPlugin(Star):
                 total_items_found += len(result_batch)
                 for item in result_batch:
                     url_str = str(item.link)
-                    if url_str not in seen_urls:
-                        formatted_results.append(
-                            {
-                                "title": item.title,
-                                "url": url_str,
-                                "snippet": item.snippet,
-                            }
-                        )
-                        seen_urls.add(url_str)
+                    if url_str not in formatted_results:
+                        formatted_results[url_str] = {
+                            "title": item.title,
+                            "url": url_str,
+                            "snippet": item.snippet,
+                        }
             elif isinstance(result_batch, Exception):
                 logger.warning(
                     f"一个搜索任务失败: {result_batch}"
@@ -312,11 +566,12 @@ class DeepResearchPlugin(Star):
         return formatted_results
 
     async def _stage2_link_selection(
-        self, provider: Provider, original_query: str, links: List[Dict[str, str]]
+        self,
+        provider: Provider,
+        original_query: str,
+        unique_links_dict: Dict[str, Dict[str, str]],
     ) -> List[str]:
-        """阶段二：链接去重与 LLM 筛选"""
-        # _search_web 已经去重过，这里可以简化或保留作为双重保险
-        unique_links_dict = {link["url"]: link for link in links}
+        """阶段二：LLM 链接筛选（传入的链接已由 _search_web 按 URL 去重）"""
         unique_links = list(unique_links_dict.values())
         if not unique_links:
             return []
@@ -341,19 +596,24 @@ class DeepResearchPlugin(Star):
         如果没有任何链接相关，返回空列表: []
         """
         prompt = f"请从以下链接中筛选出最相关的最多 {MAX_SELECTED_LINKS} 个：\n\n{link_descriptions}"
-        response_text = await self._call_llm(provider, prompt, system_prompt)
+        cache_key = self._llm_cache_key(provider, system_prompt, prompt)
+        response_text = await self._call_llm(
+            provider, prompt, system_prompt, cache_key=cache_key
+        )
         if not response_text:
             return []
         try:
-            selected_urls = json.loads(response_text)
+            selected_urls = json_loads(response_text)
             if not isinstance(selected_urls, list):
                 raise TypeError("LLM did not return a list")
             final_list = [
                 str(url) for url in selected_urls if str(url) in unique_links_dict
             ][:MAX_SELECTED_LINKS]  # 使用更新后的 MAX_SELECTED_LINKS
+            if cache_key is not None:
+                self.llm_cache.set(cache_key, response_text)
             logger.info(f"阶段二：LLM 筛选完成，选定 {len(final_list)} 个链接。")
             return final_list
-        except (json.JSONDecodeError, TypeError) as e:
+        except (ValueError, TypeError) as e:
             logger.error(
                 f"阶段二：LLM 链接筛选结果 JSON 解析失败 ({e}): {response_text[:200]}..."
             )
@@ -365,7 +625,8 @@ class DeepResearchPlugin(Star):
         """解析百度重定向链接，获取真实URL"""
         try:
             # 直接访问百度重定向链接，让其自动跳转
-            response = await self.client.get(url, follow_redirects=True)
+            async with self._fetch_semaphore:
+                response = await self.client.get(url, follow_redirects=True)
             final_url = str(response.url)
 
             # 如果最终URL还是百度域名，可能是解析失败
@@ -398,50 +659,27 @@ class DeepResearchPlugin(Star):
                 logger.info(f"百度重定向解析失败，跳过处理: {url}")
                 return None
 
-        html_content = ""
         try:
-            # 修复：正确使用httpx客户端
-            response = await self.client.get(url)
-            response.raise_for_status()  # 触发 HTTPStatusError
+            html_content, encoding = await self._download_page_with_retry(url)
 
-            # 获取内容并限制大小
-            content = response.content
-            if len(content) > MAX_CONTENT_LENGTH * 3:
-                logger.warning(f"URL {url} 内容过大，截断读取。")
-                content = content[: MAX_CONTENT_LENGTH * 3]
-
-            # 获取文本内容
-            html_content = response.text
             # --- HTML 解析与清理 (保持原有逻辑) ---
             if not html_content:
                 return None
 
-            soup = BeautifulSoup(html_content, "lxml")
-            # 移除 script 和 style
-            for script in soup(
-                ["script", "style", "noscript", "nav", "footer", "header", "aside"]
-            ):
-                script.decompose()
-
-            # 优先尝试获取 article 标签
-            main_content_tag = (
-                soup.find("article") or soup.find("main") or soup.body or soup
+            # HTML 解析是 CPU 密集型操作, 使用 run_in_executor 在线程池中运行，
+            # 避免阻塞事件循环、拖慢其他并发中的抓取
+            loop = asyncio.get_running_loop()
+            final_text = await loop.run_in_executor(
+                None, _extract_main_text, html_content, encoding
             )
-
-            # 转换为 markdown 再转回 text 以更好清理格式
-            md_text = markdown.markdown(main_content_tag.decode_contents())
-            text = "".join(BeautifulSoup(md_text, "lxml").findAll(string=True))
-            # 清理多余空白和换行
-            cleaned_text = re.sub(r"\s+", " ", text).strip()
-            final_text = cleaned_text[:MAX_CONTENT_LENGTH]
             logger.debug(
                 f"阶段三：URL {url} 内容抓取并清理完成，长度: {len(final_text)}"
             )
             return final_text
             # --- 结束 HTML 解析 ---
         # --- 修改: 捕获具体 httpx 异常 ---
-        except httpx.TimeoutException as e:
-            logger.warning(f"抓取 URL {url} 超时 ({FETCH_TIMEOUT}s): {e}")
+        except (httpx.TimeoutException, asyncio.TimeoutError) as e:
+            logger.warning(f"抓取 URL {url} 超时 ({FETCH_TIMEOUT}s): {e!r}")
             return None
         except httpx.HTTPStatusError as e:
             # 由 raise_for_status() 触发，如 404, 500
@@ -455,12 +693,67 @@ class DeepResearchPlugin(Star):
             return None
         # ------------------------------------
         except Exception as e:
-            # 捕获 BeautifulSoup, markdown, re 等解析过程中的其他错误
+            # 捕获 BeautifulSoup, re 等解析过程中的其他错误
             logger.error(
                 f"抓取或解析 URL {url} 发生未知错误: {e}", exc_info=True
             )  # 保留 exc_info
             return None
 
+    async def _download_page(self, url: str) -> Tuple[bytes, Optional[str]]:
+        """
+        下载网页原始字节，返回 (内容, 响应头声明的字符集)。
+        流式读取响应体，达到 MAX_HTML_BYTES 即停止接收，超大页面不会被完整载入内存；
+        也不在此处解码为 str，直接把字节交给解析器。
+        """
+        html_content = bytearray()
+        async with self.client.stream("GET", url) as response:
+            response.raise_for_status()  # 触发 HTTPStatusError
+            async for chunk in response.aiter_bytes():
+                html_content.extend(chunk)
+                if len(html_content) >= MAX_HTML_BYTES:
+                    logger.warning(f"URL {url} 内容过大，截断读取。")
+                    del html_content[MAX_HTML_BYTES:]
+                    break
+            return bytes(html_content), response.charset_encoding
+
+    async def _download_page_with_retry(
+        self, url: str
+    ) -> Tuple[bytes, Optional[str]]:
+        """
+        带整体超时与退避重试的网页下载。
+        每次尝试单独占用一个抓取并发名额且整体不超过 FETCH_TIMEOUT 秒，
+        防止缓慢回传的页面长期占用名额；重试前的退避等待不占名额。
+        超时、网络错误、连接被对端异常中断和临时性状态码会重试；
+        协议不支持等重试也不会成功的错误及最后一次失败直接抛出。
+        """
+        for attempt in range(1, FETCH_MAX_ATTEMPTS + 1):
+            try:
+                async with self._fetch_semaphore:
+                    return await asyncio.wait_for(
+                        self._download_page(url), timeout=FETCH_TIMEOUT
+                    )
+            except (
+                httpx.TimeoutException,
+                httpx.NetworkError,
+                httpx.RemoteProtocolError,
+                httpx.HTTPStatusError,
+                asyncio.TimeoutError,
+            ) as e:
+                if isinstance(e, httpx.HTTPStatusError) and (
+                    e.response.status_code not in RETRYABLE_STATUS_CODES
+                ):
+                    raise
+                if attempt == FETCH_MAX_ATTEMPTS:
+                    raise
+                delay = min(
+                    FETCH_RETRY_MAX_DELAY, FETCH_RETRY_BASE_DELAY * 2 ** (attempt - 1)
+                ) + random.uniform(0, 0.1)
+                logger.info(
+                    f"抓取 URL {url} 失败 ({e!r})，{delay:.2f} 秒后重试 "
+                    f"(尝试 {attempt}/{FETCH_MAX_ATTEMPTS})"
+                )
+                await asyncio.sleep(delay)
+
     async def _summarize_content(
         self, provider: Provider, query: str, url: str, content: str
     ) -> Optional[str]:
@@ -472,41 +765,366 @@ class DeepResearchPlugin(Star):
         请直接返回总结文本，不要包含任何额外的解释、标题或问候语。
         """
         prompt = f"请根据查询 “{query}” 总结以下文本：\n\n---\n{content}\n---"
-        summary = await self._call_llm(provider, prompt, system_prompt)
+        cache_key = self._llm_cache_key(provider, system_prompt, prompt)
+        summary = await self._call_llm(
+            provider, prompt, system_prompt, cache_key=cache_key
+        )
         if summary:
+            if cache_key is not None:
+                self.llm_cache.set(cache_key, summary)
             logger.info(f"阶段三：URL {url} 总结完成。")
         else:
             logger.warning(f"阶段三：URL {url} 总结失败。")
         return summary
 
-    async def _process_one_link(
-        self, provider: Provider, query: str, url: str
-    ) -> Optional[Dict[str, str]]:
-        """处理单个链接：抓取 -> 总结"""
-        content = await self._fetch_and_parse_content(url)
-        if content and len(content) > 100:  # 忽略内容过少的页面
-            summary = await self._summarize_content(provider, query, url, content)
+    async def _summarize_batch(
+        self, provider: Provider, query: str, docs: List[Tuple[str, str]]
+    ) -> List[Dict[str, str]]:
+        """
+        使用一次 LLM 调用总结多篇文档。
+        :param docs: (url, content) 列表
+        :return: 与输入顺序对应的 {"url", "summary"} 列表；批量结果无法解析时回退为逐篇总结。
+        """
+        logger.info(f"阶段三：正在批量总结 {len(docs)} 篇文档...")
+        system_prompt = f"""
+        你是一个研究分析助手。下面会提供多篇编号的文档，请分别总结出每篇文档中与原始查询：“{query}” 高度相关的关键信息。
+        总结应清晰、简洁，突出要点。忽略广告、导航等无关内容。
+        请严格按照以下 JSON 列表格式返回结果，列表长度与文档数量相同且顺序一致，不要包含任何额外的解释或文本。
+        格式要求：
+        ["文档1的总结", "文档2的总结", ...]
+        """
+        documents = "\n\n".join(
+            f"[文档 {i}] URL: {url}\n---\n{content}\n---"
+            for i, (url, content) in enumerate(docs, 1)
+        )
+        prompt = f"请根据查询 “{query}” 分别总结以下 {len(docs)} 篇文档：\n\n{documents}"
+        cache_key = self._llm_cache_key(provider, system_prompt, prompt)
+        async with self._llm_semaphore:
+            response_text = await self._call_llm(
+                provider, prompt, system_prompt, cache_key=cache_key
+            )
+        try:
+            batch_summaries = json_loads(response_text) if response_text else None
+        except ValueError:
+            batch_summaries = None
+        if isinstance(batch_summaries, list) and len(batch_summaries) == len(docs):
+            if cache_key is not None:
+                self.llm_cache.set(cache_key, response_text)
+            logger.info(f"阶段三：批量总结 {len(docs)} 篇文档完成。")
+            return [
+                {"url": url, "summary": str(summary)}
+                for (url, _), summary in zip(docs, batch_summaries)
+                if summary
+            ]
+
+        logger.warning("阶段三：批量总结结果无法解析，回退为逐篇总结。")
+        results = []
+        for url, content in docs:
+            async with self._llm_semaphore:
+                summary = await self._summarize_content(provider, query, url, content)
             if summary:
-                return {"url": url, "summary": summary}
+                results.append({"url": url, "summary": summary})
+        return results
+
+    @staticmethod
+    def _provider_model_name(provider: Provider) -> str:
+        """获取 Provider 当前使用的模型名，用于区分不同模型生成的缓存结果"""
+        try:
+            return provider.get_model() or ""
+        except Exception:
+            return ""
+
+    def _llm_cache_key(
+        self, provider: Provider, system_prompt: str, prompt: str
+    ) -> Optional[str]:
+        """LLM 响应缓存键；缓存关闭时返回 None。最终报告不走该缓存。"""
+        if not self.llm_cache.enabled:
+            return None
+        return make_cache_key(
+            self._provider_model_name(provider), system_prompt, prompt
+        )
+
+    def _summary_cache_key(self, provider: Provider, query: str, url: str) -> str:
+        return make_cache_key(
+            self._provider_model_name(provider), normalize_query(query), url
+        )
+
+    def _content_cache_key(self, provider: Provider, query: str, content: str) -> str:
+        """按正文指纹而非 URL 计算的摘要缓存键，用于复用内容重复页面的摘要"""
+        return make_cache_key(
+            self._provider_model_name(provider),
+            normalize_query(query),
+            "content",
+            _content_fingerprint(content),
+        )
+
+    async def _fetch_with_limit(self, url: str) -> Optional[str]:
+        """在抓取并发限制下获取单个 URL 的正文，并发名额在每次网络请求时获取。
+        规范化后相同的 URL 同时被请求时会被合并，只发起一次抓取。"""
+        key = _normalize_url(url)
+        inflight = self._inflight_fetches.get(key)
+        if inflight is not None:
+            logger.debug(f"复用进行中的抓取: {url}")
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_fetches[key] = future
+        try:
+            content = await self._fetch_and_parse_content(url)
+            future.set_result(content)
+            return content
+        finally:
+            if not future.done():
+                future.set_result(None)
+            self._inflight_fetches.pop(key, None)
+
+    def _passes_keyword_prefilter(
+        self, url: str, content: str, term_tokens: Tuple[FrozenSet[str], ...]
+    ) -> bool:
+        """
+        本地关键词预筛选：正文与查询/各搜索词几乎没有重合的网页直接跳过，
+        省去一次 LLM 总结调用。只过滤明显无关的页面，其余仍交给 LLM 判断。
+        """
+        if self.keyword_prefilter_threshold <= 0:
+            return True
+        score = _keyword_overlap(term_tokens, content)
+        if score < self.keyword_prefilter_threshold:
+            logger.info(
+                f"阶段三：URL {url} 关键词重合度 {score:.2f} 低于阈值，跳过总结。"
+            )
+            return False
+        return True
+
+    async def _stage3_batched_processing(
+        self,
+        provider: Provider,
+        query: str,
+        selected_links: List[str],
+        term_tokens: Tuple[FrozenSet[str], ...] = (),
+    ) -> List[Dict[str, str]]:
+        """
+        阶段三（批量模式）：并行抓取全部内容，再按 llm_batch_size 分组总结
+        结果按序号放回对应位置，与逐条模式一样保持筛选时的链接顺序。
+        """
+        results: List[Optional[Dict[str, str]]] = [None] * len(selected_links)
+        indices_to_fetch: List[int] = []
+        for i, link in enumerate(selected_links):
+            cached = self.summary_cache.get(
+                self._summary_cache_key(provider, query, link)
+            )
+            if cached:
+                results[i] = {"url": link, "summary": cached}
+            else:
+                indices_to_fetch.append(i)
+
+        contents = await asyncio.gather(
+            *(self._fetch_with_limit(selected_links[i]) for i in indices_to_fetch),
+            return_exceptions=True,
+        )
+        # 按正文指纹分组：镜像站、转载页等正文重复的页面只总结一次
+        docs_by_key: Dict[str, List[Tuple[int, str, str]]] = {}
+        skipped: List[Tuple[int, str, str]] = []
+        for i, content in zip(indices_to_fetch, contents):
+            link = selected_links[i]
+            if not isinstance(content, str) or len(content) <= 100:
+                continue  # 忽略内容过少的页面
+            if not self._passes_keyword_prefilter(link, content, term_tokens):
+                skipped.append((i, link, content))
+                continue
+            content_key = self._content_cache_key(provider, query, content)
+            reused = self.summary_cache.get(content_key)
+            if reused:
+                logger.info(f"阶段三：URL {link} 正文与已总结的页面重复，复用其摘要。")
+                results[i] = {"url": link, "summary": reused}
+            else:
+                docs_by_key.setdefault(content_key, []).append((i, link, content))
+        if not docs_by_key and not any(results) and skipped:
+            # 预筛选不能让阶段二选出的链接全部落空，此时退回为总结被跳过的页面
+            logger.warning("阶段三：所有链接均未通过关键词预筛选，改为全部总结。")
+            for i, link, content in skipped:
+                docs_by_key.setdefault(
+                    self._content_cache_key(provider, query, content), []
+                ).append((i, link, content))
+        # 每组只取第一篇送去总结
+        docs = [(group[0][1], group[0][2]) for group in docs_by_key.values()]
+        batch_size = self.llm_batch_size
+        batches = [docs[i : i + batch_size] for i in range(0, len(docs), batch_size)]
+        batch_results = await asyncio.gather(
+            *(self._summarize_batch(provider, query, batch) for batch in batches),
+            return_exceptions=True,
+        )
+        summary_by_url = {
+            item["url"]: item["summary"]
+            for result in batch_results
+            if isinstance(result, list)
+            for item in result
+        }
+        # 把每组代表页面的摘要复制给组内所有 URL
+        for content_key, group in docs_by_key.items():
+            summary = summary_by_url.get(group[0][1])
+            if not summary:
+                continue
+            if len(group) > 1:
+                logger.info(
+                    f"阶段三：{len(group) - 1} 个页面与 URL {group[0][1]} 正文重复，复用其摘要。"
+                )
+            self.summary_cache.set(content_key, summary)
+            for i, link, _ in group:
+                self.summary_cache.set(
+                    self._summary_cache_key(provider, query, link), summary
+                )
+                results[i] = {"url": link, "summary": summary}
+        return [res for res in results if res is not None]
+
+    async def _summarize_and_cache(
+        self, provider: Provider, query: str, url: str, content: str
+    ) -> Optional[Dict[str, str]]:
+        """
+        (按正文查缓存) -> 总结单篇已抓取的正文，并写入摘要缓存。
+        镜像站、转载页的正文与已总结过或正在总结的页面基本一致时，直接复用其摘要；
+        同一正文的并发总结会被合并，只发起一次 LLM 调用。
+        """
+        content_key = self._content_cache_key(provider, query, content)
+        summary = self.summary_cache.get(content_key)
+        if summary:
+            logger.info(f"阶段三：URL {url} 正文与已总结的页面重复，复用其摘要。")
+        elif content_key in self._inflight_summaries:
+            logger.info(f"阶段三：URL {url} 正文与正在总结的页面重复，等待复用其摘要。")
+            summary = await asyncio.shield(self._inflight_summaries[content_key])
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight_summaries[content_key] = future
+            try:
+                async with self._llm_semaphore:
+                    summary = await self._summarize_content(
+                        provider, query, url, content
+                    )
+                if summary:
+                    self.summary_cache.set(content_key, summary)
+                future.set_result(summary)
+            finally:
+                if not future.done():
+                    future.set_result(None)
+                self._inflight_summaries.pop(content_key, None)
+        if summary:
+            self.summary_cache.set(
+                self._summary_cache_key(provider, query, url), summary
+            )
+            return {"url": url, "summary": summary}
         return None
 
+    async def _process_one_link(
+        self,
+        provider: Provider,
+        query: str,
+        url: str,
+        term_tokens: Tuple[FrozenSet[str], ...] = (),
+        skipped: Optional[List[Tuple[str, str]]] = None,
+    ) -> Optional[Dict[str, str]]:
+        """
+        处理单个链接：(查缓存) -> 抓取 -> 关键词预筛选 -> 总结
+        未通过预筛选的 (url, 正文) 会追加到 skipped 中，供调用方在必要时回退总结。
+        """
+        cached_summary = self.summary_cache.get(
+            self._summary_cache_key(provider, query, url)
+        )
+        if cached_summary:
+            logger.info(f"阶段三：URL {url} 命中摘要缓存。")
+            return {"url": url, "summary": cached_summary}
+
+        content = await self._fetch_with_limit(url)
+        if not content or len(content) <= 100:  # 忽略内容过少的页面
+            return None
+        if not self._passes_keyword_prefilter(url, content, term_tokens):
+            if skipped is not None:
+                skipped.append((url, content))
+            return None
+        return await self._summarize_and_cache(provider, query, url, content)
+
+    async def _process_one_link_indexed(
+        self,
+        index: int,
+        provider: Provider,
+        query: str,
+        url: str,
+        term_tokens: Tuple[FrozenSet[str], ...] = (),
+        skipped: Optional[List[Tuple[str, str]]] = None,
+    ) -> Tuple[int, Optional[Dict[str, str]]]:
+        """带序号地处理单个链接，便于按完成顺序收集结果后还原原始顺序"""
+        try:
+            return index, await self._process_one_link(
+                provider, query, url, term_tokens, skipped
+            )
+        except Exception as e:
+            logger.error(f"阶段三：处理 URL {url} 时发生错误: {e}", exc_info=True)
+            return index, None
+
     async def _stage3_content_processing(
-        self, provider: Provider, query: str, selected_links: List[str]
+        self,
+        provider: Provider,
+        query: str,
+        selected_links: List[str],
+        event: Optional[AstrMessageEvent] = None,
+        topics: Optional[List[str]] = None,
     ) -> List[Dict[str, str]]:
-        """阶段三：并行抓取内容并生成摘要"""
+        """
+        阶段三：并行抓取内容并生成摘要
+        传入 event 时，会随着链接陆续处理完成向用户推送进度，而不是等全部完成后才有反馈。
+        topics 为阶段一生成的子主题/搜索词，与查询一起用于总结前的关键词预筛选。
+        """
         logger.info("阶段三：开始并行抓取和总结内容...")
-        # 创建并行任务
-        tasks = [
-            self._process_one_link(provider, query, link) for link in selected_links
-        ]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # 各搜索词的词元每次研究只计算一次，供所有链接的预筛选共用
+        term_tokens = tuple(
+            tokens
+            for tokens in map(_keyword_tokens, dict.fromkeys([query, *(topics or [])]))
+            if tokens
+        )
+        if self.llm_batch_size > 1:
+            summaries = await self._stage3_batched_processing(
+                provider, query, selected_links, term_tokens
+            )
+        else:
+            total = len(selected_links)
+            # 大约每完成四分之一推送一次进度
+            progress_step = math.ceil(total / 4)
+            results: List[Optional[Dict[str, str]]] = [None] * total
+            skipped: List[Tuple[str, str]] = []
+            # 创建并行任务，按完成顺序收集
+            tasks = [
+                self._process_one_link_indexed(
+                    i, provider, query, link, term_tokens, skipped
+                )
+                for i, link in enumerate(selected_links)
+            ]
+            for done, next_done in enumerate(asyncio.as_completed(tasks), 1):
+                index, result = await next_done
+                results[index] = result
+                if event and done < total and done % progress_step == 0:
+                    try:
+                        await event.send(
+                            MessageChain().message(
+                                f"⏳ 阶段三进度：已处理 {done}/{total} 个链接..."
+                            )
+                        )
+                    except Exception as e:
+                        # 进度消息发送失败不影响主流程
+                        logger.warning(f"阶段三：发送进度消息失败: {e}")
 
-        # 过滤掉失败或无效的结果
-        summaries = [
-            res
-            for res in results
-            if isinstance(res, dict) and res is not None and "summary" in res
-        ]
+            # 过滤掉失败或无效的结果，保持筛选时的链接顺序
+            summaries = [
+                res for res in results if isinstance(res, dict) and "summary" in res
+            ]
+            if not summaries and skipped:
+                # 预筛选不能让阶段二选出的链接全部落空，此时退回为总结被跳过的页面
+                logger.warning("阶段三：所有链接均未通过关键词预筛选，改为全部总结。")
+                fallback = await asyncio.gather(
+                    *(
+                        self._summarize_and_cache(provider, query, url, content)
+                        for url, content in skipped
+                    ),
+                    return_exceptions=True,
+                )
+                summaries = [res for res in fallback if isinstance(res, dict)]
         logger.info(
             f"阶段三：成功处理并总结了 {len(summaries)} / {len(selected_links)} 个链接。"
         )
@@ -561,7 +1179,7 @@ class DeepResearchPlugin(Star):
     ) -> Optional[Any]:
         """阶段四：使用输出格式管理器生成报告"""
         if not output_format:
-            output_format = self.output_manager.get_default_format()
+            output_format = self.default_output_format
 
         logger.info(f"阶段四：开始生成 {output_format} 格式报告...")
 
@@ -585,6 +1203,40 @@ class DeepResearchPlugin(Star):
             )
             return None
 
+    @staticmethod
+    def _image_report_result(
+        event: AstrMessageEvent, output_format: str, status_msg: str, report: Any
+    ) -> MessageEventResult:
+        """图片格式：使用消息链发送文本和图片"""
+        return event.chain_result(
+            [
+                Comp.Plain(text=status_msg + "\n为您生成了图片报告："),
+                Comp.Image.fromURL(report),
+            ]
+        )
+
+    @staticmethod
+    def _html_report_result(
+        event: AstrMessageEvent, output_format: str, status_msg: str, report: Any
+    ) -> MessageEventResult:
+        """HTML格式：使用File组件发送HTML文件"""
+        filename = os.path.basename(report)
+        return event.chain_result(
+            [
+                Comp.Plain(text=status_msg + "\n为您生成了HTML报告："),
+                Comp.File(name=filename, file=report),
+            ]
+        )
+
+    @staticmethod
+    def _text_report_result(
+        event: AstrMessageEvent, output_format: str, status_msg: str, report: Any
+    ) -> MessageEventResult:
+        """其他格式：直接返回结果"""
+        return event.plain_result(
+            status_msg + f"\n为您生成了{output_format}格式报告：\n\n{report}"
+        )
+
     # ------------------ 主流程控制 ------------------
 
     async def _run_research_pipeline(
@@ -600,6 +1252,7 @@ class DeepResearchPlugin(Star):
             return
 
         start_time = asyncio.get_running_loop().time()
+        llm_cache_hits, llm_cache_misses = self.llm_cache.hits, self.llm_cache.misses
         yield event.plain_result(
             f"🔎 收到研究请求: '{query}'\n⏳ 开始阶段一：查询处理与扩展..."
         )
@@ -657,7 +1310,11 @@ class DeepResearchPlugin(Star):
                 )
                 # 阶段三 - 处理
                 summaries = await self._stage3_content_processing(
-                    provider, query, selected_links
+                    provider,
+                    query,
+                    selected_links,
+                    event,
+                    parsed_query.get("all_search_terms"),
                 )
                 if not summaries:
                     yield event.plain_result(
@@ -685,39 +1342,24 @@ class DeepResearchPlugin(Star):
 
             end_time = asyncio.get_running_loop().time()
             duration = round(end_time - start_time, 2)
+            if self.llm_cache.enabled:
+                # 并发执行的其他研究也会计入，仅作为缓存效果的参考
+                logger.info(
+                    f"本次研究 LLM 响应缓存命中 {self.llm_cache.hits - llm_cache_hits} 次，"
+                    f"未命中 {self.llm_cache.misses - llm_cache_misses} 次。"
+                )
 
             # 获取实际使用的输出格式
-            actual_format = output_format or self.config.get("default_output_format", "image")
+            actual_format = output_format or self.default_output_format
             logger.debug(f"实际使用的输出格式: {actual_format}")
             # 最终输出
             status_msg = f"✅ 深度研究完成！总耗时: {duration} 秒。"
 
             if report_result:
-                if actual_format == "image":
-                    # 图片格式：使用消息链发送文本和图片
-                    yield event.chain_result(
-                        [
-                            Comp.Plain(text=status_msg + "\n为您生成了图片报告："),
-                            Comp.Image.fromURL(report_result),
-                        ]
-                    )
-                elif actual_format == "html":
-                    # HTML格式：使用File组件发送HTML文件
-                    import os
-
-                    filename = os.path.basename(report_result)
-                    yield event.chain_result(
-                        [
-                            Comp.Plain(text=status_msg + "\n为您生成了HTML报告："),
-                            Comp.File(name=filename, file=report_result),
-                        ]
-                    )
-                else:
-                    # 其他格式：直接返回结果
-                    yield event.plain_result(
-                        status_msg
-                        + f"\n为您生成了{actual_format}格式报告：\n\n{report_result}"
-                    )
+                build_result = self._report_result_builders.get(
+                    actual_format, self._text_report_result
+                )
+                yield build_result(event, actual_format, status_msg, report_result)
             else:
                 # 报告生成失败，回退到原始Markdown
                 yield event.plain_result(
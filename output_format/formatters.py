@@ -7,47 +7,7 @@ from astrbot.api.star import Star
 from astrbot.api import logger
 
 from .base import BaseOutputFormatter
-
-# HTML 报告模板
-HTML_REPORT_TEMPLATE = """
-<!DOCTYPE html>
-<html>
-<head>
-<meta charset="UTF-8">
-<title>Deep Research Report</title>
-<style>
-  body {{
-    font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol";
-    line-height: 1.6;
-    color: #333;
-    background-color: #f9f9f9;
-    padding: 20px;
-    max-width: 900px;
-    margin: 20px auto;
-    border: 1px solid #eee;
-    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    border-radius: 8px;
-  }}
-  h1, h2, h3 {{ color: #0056b3; border-bottom: 1px solid #eee; padding-bottom: 5px;}}
-  h1 {{ text-align: center; }}
-  a {{ color: #007bff; text-decoration: none; }}
-  a:hover {{ text-decoration: underline; }}
-  pre {{ background-color: #eee; padding: 10px; border-radius: 4px; overflow-x: auto; }}
-  code {{ background-color: #eee; padding: 2px 4px; border-radius: 3px; font-size: 0.9em;}}
-  blockquote {{ border-left: 4px solid #ccc; padding-left: 15px; margin-left: 0; color: #555; font-style: italic;}}
-   img {{ max-width: 100%; height: auto; }}
-   ul, ol {{ padding-left: 25px; }}
-   li {{ margin-bottom: 8px;}}
-  .footer {{ margin-top: 30px; font-size: 0.8em; color: #777; text-align: center; border-top: 1px solid #eee; padding-top: 10px;}}
-</style>
-</head>
-<body>
-  <h1>深度研究报告</h1>
-  {content}
-  <div class="footer">Generated by AstrBot DeepResearch Plugin</div>
-</body>
-</html>
-"""
+from ..config import HTML_REPORT_TEMPLATE
 
 
 class ImageFormatter(BaseOutputFormatter):
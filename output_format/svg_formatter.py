@@ -6,6 +6,7 @@ import re
 import tempfile
 import datetime
 import html
+import secrets
 from typing import Dict, Optional, List, TypedDict
 import asyncio
 import aiohttp
@@ -16,6 +17,24 @@ from astrbot.api import logger
 from .base import BaseOutputFormatter
 
 
+# 段落级行内 Markdown 规则 (模式, 替换)，按顺序应用
+INLINE_MARKDOWN_RULES = (
+    (re.compile(r"\*\*(.*?)\*\*"), r"<strong>\1</strong>"),
+    (re.compile(r"__(.*?)__"), r"<strong>\1</strong>"),
+    (re.compile(r"(?<!\*)\*([^*]+)\*(?!\*)"), r"<em>\1</em>"),
+    (re.compile(r"(?<!_)_([^_]+)_(?!_)"), r"<em>\1</em>"),
+    (re.compile(r"~~(.*?)~~"), r"<del>\1</del>"),
+    (re.compile(r"`([^`]+)`"), r"<code>\1</code>"),
+    (
+        re.compile(r"\[([^\]]+)\]\((https?://[^\)]+)\)"),
+        r'<a href="\2" target="_blank" rel="noopener noreferrer">\1</a>',
+    ),
+)
+LIST_MARKER_RE = re.compile(r"^[-*+]\s*")
+BLOCK_TAG_START_RE = re.compile(r"^\s*<(h[1-6]|ul|li)")
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+
 # 定义类型
 class MarkdownSection(TypedDict):
     id: str
@@ -163,8 +182,6 @@ class SVGFormatter(BaseOutputFormatter):
         """
         增强的Markdown渲染函数，支持代码块、多级标题和来源链接
         """
-        import uuid
-
         # 用于存储占位符
         placeholders = {}
         # 用于来源链接的计数器，以生成唯一编号
@@ -204,7 +221,7 @@ class SVGFormatter(BaseOutputFormatter):
 
             # 添加语言标识属性
             code_html = f'<pre class="language-{normalized_lang}" data-language="{display_lang}"><code class="language-{normalized_lang}">{escaped_code}</code></pre>'
-            placeholder = f"CODEBLOCK{uuid.uuid4().hex}ENDCODE"
+            placeholder = f"CODEBLOCK{secrets.token_hex(8)}ENDCODE"
             placeholders[placeholder] = code_html
             return placeholder
 
@@ -236,7 +253,7 @@ class SVGFormatter(BaseOutputFormatter):
             # 移除HTML片段中的换行符和多余空格
             link_html = re.sub(r"\s*\n\s*", " ", link_html).strip()
 
-            placeholder = f"LINKPLACEHOLDER{uuid.uuid4().hex}ENDLINK"
+            placeholder = f"LINKPLACEHOLDER{secrets.token_hex(8)}ENDLINK"
             placeholders[placeholder] = link_html
             return placeholder
 
@@ -292,7 +309,7 @@ class SVGFormatter(BaseOutputFormatter):
                     in_list = False
 
                 if is_list_item:
-                    item_content = re.sub(r"^[-*+]\s*", "", stripped_line)
+                    item_content = LIST_MARKER_RE.sub("", stripped_line)
                     processed_lines.append(f"<li>{item_content}</li>")
                 else:
                     processed_lines.append(line)
@@ -303,23 +320,10 @@ class SVGFormatter(BaseOutputFormatter):
             para_content = "\n".join(processed_lines)
 
             # 处理行内Markdown格式
-            para_content = re.sub(
-                r"\*\*(.*?)\*\*", r"<strong>\1</strong>", para_content
-            )
-            para_content = re.sub(r"__(.*?)__", r"<strong>\1</strong>", para_content)
-            para_content = re.sub(
-                r"(?<!\*)\*([^*]+)\*(?!\*)", r"<em>\1</em>", para_content
-            )
-            para_content = re.sub(r"(?<!_)_([^_]+)_(?!_)", r"<em>\1</em>", para_content)
-            para_content = re.sub(r"~~(.*?)~~", r"<del>\1</del>", para_content)
-            para_content = re.sub(r"`([^`]+)`", r"<code>\1</code>", para_content)
-            para_content = re.sub(
-                r"\[([^\]]+)\]\((https?://[^\)]+)\)",
-                r'<a href="\2" target="_blank" rel="noopener noreferrer">\1</a>',
-                para_content,
-            )
+            for pattern, replacement in INLINE_MARKDOWN_RULES:
+                para_content = pattern.sub(replacement, para_content)
 
-            if not re.match(r"^\s*<(h[1-6]|ul|li)", para_content.lstrip()):
+            if not BLOCK_TAG_START_RE.match(para_content.lstrip()):
                 para_content = f"<p>{para_content.replace(chr(10), '<br>')}</p>"
 
             html_paragraphs.append(para_content)
@@ -445,7 +449,7 @@ class SVGFormatter(BaseOutputFormatter):
             )
             if h1_match:
                 # 清理HTML标签并提取纯文本
-                clean_title = re.sub(r"<[^>]+>", "", h1_match.group(1)).strip()
+                clean_title = HTML_TAG_RE.sub("", h1_match.group(1)).strip()
                 if clean_title:
                     sidebar_title = html.escape(clean_title) + " - 研究报告"
 
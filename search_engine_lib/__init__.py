@@ -1,5 +1,4 @@
 import asyncio
-import inspect
 from astrbot.api import logger
 from typing import Dict, List, Optional, Type
 
@@ -24,17 +23,16 @@ def register_engine(cls: Type[BaseSearchEngine]) -> Type[BaseSearchEngine]:
     一个类装饰器，用于自动注册搜索引擎类。
     """
     # 确保被装饰的是 BaseSearchEngine 的子类
-    if not inspect.isclass(cls) or not issubclass(cls, BaseSearchEngine):
+    if not isinstance(cls, type) or not issubclass(cls, BaseSearchEngine):
         raise TypeError(
             f"被 @register_engine 装饰的对象 {cls.__name__} 不是 BaseSearchEngine 的有效子类。"
         )
 
-    # 为了获取 name，我们需要临时创建一个实例。
-    # 这里的 config 是一个空字典，因为此时我们还没有用户的实际配置。
-    # 搜索引擎的 __init__ 应该能够处理这种情况。
+    # name 是只返回常量的属性，不依赖实例状态。
+    # 通过 __new__ 创建一个未初始化的实例读取它，避免在导入阶段执行 __init__
+    # (读取配置、创建信号量等)，真正的实例化推迟到 initialize() 中。
     try:
-        temp_instance = cls(config={})
-        name = temp_instance.name
+        name = cls.__new__(cls).name
     except Exception as e:
         logger.error(
             f"在尝试注册类 {cls.__name__} 时获取其名称失败: {e}", exc_info=True
@@ -90,6 +88,17 @@ async def _initialize_and_validate_engine(
     (内部函数) 异步处理单个搜索引擎的实例化、验证和最终注册。
     """
     try:
+        # 0. 先按类属性检查必需配置，缺失时无需实例化
+        engine_config = (config or {}).get(name) or {}
+        missing_keys = [
+            key for key in engine_class.required_config_keys if not engine_config.get(key)
+        ]
+        if missing_keys:
+            logger.warning(
+                f"❌ 引擎 '{name}' 缺少必需配置 {missing_keys}，跳过初始化。"
+            )
+            return
+
         # 1. 实例化搜索引擎，传入全局配置
         instance = engine_class(config=config)
 
@@ -138,3 +147,20 @@ def get_engine(name: str) -> Optional[BaseSearchEngine]:
     if not engine:
         logger.error(f"无法找到名为 '{name}' 的搜索引擎。可用引擎: {list_engines()}")
     return engine
+
+
+async def close():
+    """并发关闭所有已注册引擎持有的 HTTP 会话。"""
+    await asyncio.gather(
+        *(_close_engine(name, engine) for name, engine in _engine_registry.items())
+    )
+
+
+async def _close_engine(name: str, engine: BaseSearchEngine):
+    """
+    (内部函数) 关闭单个引擎的会话，出错时仅记录日志，不影响其他引擎。
+    """
+    try:
+        await engine.close()
+    except Exception as e:
+        logger.warning(f"关闭引擎 '{name}' 的会话时出错: {e}")
@@ -1,8 +1,25 @@
 # coding: utf-8
+import asyncio
+import json
+import time
+from collections import deque
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Deque, Dict, Any, Optional, Tuple
+
+import aiohttp
 from astrbot.api import logger
+
 from .models import SearchQuery, SearchResponse
+from ..core.constants import REQUEST_TIMEOUT_SECONDS
+
+# 优先使用 orjson 解析 API 响应，未安装时回退到标准库。
+# 两者的解码错误都是 ValueError 的子类。
+try:
+    import orjson
+
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 
 class BaseSearchEngine(ABC):
@@ -11,6 +28,29 @@ class BaseSearchEngine(ABC):
     所有具体的搜索引擎实现都必须继承此类，并实现其所有抽象方法和属性。
     """
 
+    # 单个引擎实例允许的最大并发请求数，可通过引擎配置中的
+    # "max_concurrent_requests" 覆盖
+    max_concurrent_requests: int = 8
+
+    # 引擎配置中必须存在的键。缺少任一键时 initialize() 会直接跳过该引擎，
+    # 不再实例化后才由 check_config 判定失败
+    required_config_keys: Tuple[str, ...] = ()
+
+    # 每分钟允许的最大请求数，None 表示不限速。可通过引擎配置中的
+    # "rate_limit_per_minute" 覆盖
+    rate_limit_per_minute: Optional[int] = None
+
+    # 引擎 HTTP 会话的默认超时配置
+    timeout_config = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
+
+    # 连接池与 DNS 缓存参数。会话在引擎生命周期内复用，DNS 缓存也随之保留
+    connector_options: Dict[str, Any] = {
+        "limit": 100,
+        "limit_per_host": 10,
+        "ttl_dns_cache": 300,
+        "use_dns_cache": True,
+    }
+
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         初始化基类。
@@ -18,6 +58,29 @@ class BaseSearchEngine(ABC):
         """
         self.config = config or {}
         logger.debug(f"正在初始化搜索引擎: {self.name}")
+        # 限制单个引擎同时进行的请求数，避免并发扇出时耗尽连接或触发对端限流。
+        # 至少为 1，配置为 0 会让该引擎的所有搜索永久阻塞
+        engine_config = self.config.get(self.name) or {}
+        self.semaphore = asyncio.Semaphore(
+            max(
+                1,
+                engine_config.get(
+                    "max_concurrent_requests", self.max_concurrent_requests
+                ),
+            )
+        )
+        # 滑动窗口限速：记录最近 60 秒内各次请求的发起时间
+        self._rate_limit = engine_config.get(
+            "rate_limit_per_minute", self.rate_limit_per_minute
+        )
+        if self._rate_limit is not None and self._rate_limit < 0:
+            raise ValueError(
+                f"引擎 '{self.name}' 的 rate_limit_per_minute 不能为负数: {self._rate_limit}"
+            )
+        self._request_times: Deque[float] = deque()
+        self._rate_lock = asyncio.Lock()
+        # 引擎级别的长连接会话，首次请求时创建，在 close() 中关闭
+        self._session: Optional[aiohttp.ClientSession] = None
 
     @property
     @abstractmethod
@@ -55,3 +118,48 @@ class BaseSearchEngine(ABC):
         :return: 一个包含搜索结果和元数据的 SearchResponse 对象。
         """
         raise NotImplementedError
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """
+        创建该引擎使用的 HTTP 会话。
+        子类可以重写此方法以定制 connector、SSL 等参数。
+        """
+        connector = aiohttp.TCPConnector(**self.connector_options)
+        return aiohttp.ClientSession(timeout=self.timeout_config, connector=connector)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        获取引擎级别的 HTTP 会话，在多次搜索之间复用连接池、DNS 缓存与 TLS 连接。
+        """
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    async def wait_for_rate_limit(self):
+        """
+        在发起一次 API 请求前调用。最近 60 秒内的请求数已达上限时，
+        等待到窗口中最早的请求过期，避免触发对端 429 限流而浪费配额。
+        """
+        if not self._rate_limit:
+            return
+        async with self._rate_lock:
+            while True:
+                now = time.monotonic()
+                while self._request_times and now - self._request_times[0] >= 60:
+                    self._request_times.popleft()
+                if len(self._request_times) < self._rate_limit:
+                    self._request_times.append(now)
+                    return
+                wait_seconds = 60 - (now - self._request_times[0])
+                logger.debug(
+                    f"[{self.name}] 达到每分钟 {self._rate_limit} 次的请求上限，等待 {wait_seconds:.2f} 秒"
+                )
+                await asyncio.sleep(wait_seconds)
+
+    async def close(self):
+        """
+        关闭引擎持有的 HTTP 会话。插件卸载时调用。
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
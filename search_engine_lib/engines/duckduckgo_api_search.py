@@ -22,6 +22,9 @@ from astrbot.api import logger
 class DuckDuckGoAPISearch(BaseSearchEngine):
     """使用官方DuckDuckGo搜索库进行搜索的引擎。"""
 
+    # DDGS 在线程池中同步执行，且对频繁请求限流严格
+    max_concurrent_requests = 2
+
     @property
     def name(self) -> str:
         return "duckduckgo_api"
@@ -53,12 +56,13 @@ class DuckDuckGoAPISearch(BaseSearchEngine):
                 search_time_seconds=0.0,
             )
 
-        start_time = time.time()
+        start_time = time.perf_counter()
         logger.info(
             f"[{self.name}] 正在搜索: '{search_query.query}' (count={search_query.count})"
         )
         results_list = []
 
+        await self.wait_for_rate_limit()
         try:
             # 使用异步执行器运行同步的DDGS搜索
             loop = asyncio.get_event_loop()
@@ -67,10 +71,14 @@ class DuckDuckGoAPISearch(BaseSearchEngine):
             )
 
             for item in ddgs_results:
+                # 缺少链接的条目必然无法通过校验，先行跳过以省去模型构造开销
+                link = item.get("href")
+                if not link:
+                    continue
                 try:
                     result_item = SearchResultItem(
                         title=item.get("title", "无标题"),
-                        link=item.get("href", ""),
+                        link=link,
                         snippet=item.get("body", "无摘要"),
                     )
                     results_list.append(result_item)
@@ -81,16 +89,16 @@ class DuckDuckGoAPISearch(BaseSearchEngine):
         except Exception as e:
             logger.error(f"[{self.name}] 搜索时发生错误: {e}", exc_info=True)
 
-        end_time = time.time()
+        elapsed = round(time.perf_counter() - start_time, 4)
         logger.info(
-            f"[{self.name}] 搜索完成, 共找到 {len(results_list)} 条结果, 耗时 {round(end_time - start_time, 4)} 秒"
+            f"[{self.name}] 搜索完成, 共找到 {len(results_list)} 条结果, 耗时 {elapsed} 秒"
         )
 
         return SearchResponse(
             query=search_query,
             engine_name=self.name,
             results=results_list,
-            search_time_seconds=round(end_time - start_time, 4),
+            search_time_seconds=elapsed,
             estimated_total_results=None,
         )
 
@@ -1,26 +1,29 @@
 import time
 import asyncio  # <-- 新增
-from typing import Dict, Any
-import json  # <-- 新增: 捕获 JSON 解码错误
+from typing import Dict, Any, List, Optional, Tuple
 
-import aiohttp
-from aiohttp import ClientError, ClientResponseError, ClientTimeout  # <-- 新增
+from aiohttp import ClientError, ClientResponseError  # <-- 新增
 from pydantic import ValidationError
 
 from .. import register_engine
-from ..base import BaseSearchEngine
+from ..base import BaseSearchEngine, json_loads
 from ..models import SearchQuery, SearchResultItem, SearchResponse
 from astrbot.api import logger
 from ...core.constants import REQUEST_TIMEOUT_SECONDS
-# --- 新增: 超时配置 ---
-TIMEOUT_CONFIG = ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
-# ---------------------
+
+# Custom Search API 单次请求的 num 参数上限
+MAX_RESULTS_PER_REQUEST = 10
 
 
 @register_engine
 class GoogleApiSearch(BaseSearchEngine):
     """使用 Google Custom Search JSON API 进行搜索的引擎。"""
 
+    # Google CSE 配额约 100 次/分钟
+    max_concurrent_requests = 10
+    rate_limit_per_minute = 100
+    required_config_keys = ("api_key", "cse_id")
+
     @property
     def name(self) -> str:
         return "google_api"
@@ -36,6 +39,15 @@ class GoogleApiSearch(BaseSearchEngine):
         self.api_key = engine_config.get("api_key")
         self.cse_id = engine_config.get("cse_id")
         self.api_url = "https://www.googleapis.com/customsearch/v1"
+        # 每次请求都相同的参数在初始化时固定下来，请求时一次性构造参数字典
+        self._base_params_items = (("key", self.api_key), ("cx", self.cse_id))
+        # 相同查询的结果缓存，避免重复消耗每日配额。设置 cache_ttl 为 0 可关闭缓存
+        self.cache_ttl: float = engine_config.get("cache_ttl", 3600)
+        self.cache_max_size: int = engine_config.get("cache_max_size", 512)
+        # key: (query, count) -> (过期时间, 结果列表, 估算总数)
+        self._cache: Dict[
+            Tuple[str, int], Tuple[float, List[SearchResultItem], Optional[int]]
+        ] = {}
         logger.debug(
             f"[{self.name}] 初始化完成。 API_KEY={'*' * 6 if self.api_key else 'None'}, CSE_ID={self.cse_id or 'None'}"
         )  # 隐藏key
@@ -49,109 +61,186 @@ class GoogleApiSearch(BaseSearchEngine):
         return True
 
     async def search(self, search_query: SearchQuery) -> SearchResponse:
-        start_time = time.time()
-        params = {
-            "key": self.api_key,
-            "cx": self.cse_id,
-            "q": search_query.query,
-            "num": search_query.count,
-        }
-        # 检查配置，防止用无效的 key/id 发起请求
-        if not self.api_key or not self.cse_id:
-            logger.error(f"[{self.name}] 配置不完整，拒绝执行搜索。")
+        start_time = time.perf_counter()
+        # api_key / cse_id 已由 required_config_keys 与 check_config 在注册前校验，
+        # 未通过校验的引擎不会进入注册表，这里无需逐次重复检查
+
+        cache_key = (search_query.query, search_query.count)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            logger.info(f"[{self.name}] 命中缓存: '{search_query.query}'")
+            cached_results, cached_total = cached
             return SearchResponse(
                 query=search_query,
                 engine_name=self.name,
-                results=[],
-                search_time_seconds=0,
+                results=list(cached_results),
+                search_time_seconds=round(time.perf_counter() - start_time, 4),
+                estimated_total_results=cached_total,
             )
 
         logger.info(
             f"[{self.name}] 正在搜索: '{search_query.query}' (Timeout={REQUEST_TIMEOUT_SECONDS}s)"
         )
-        results_list = []
-        estimated_total = None
 
-        # --- 修改: session 中加入 timeout ---
-        async with aiohttp.ClientSession(timeout=TIMEOUT_CONFIG) as session:
-            try:
-                async with session.get(self.api_url, params=params) as response:
-                    # 检查状态码，对于API，非200都应视为错误
-                    response.raise_for_status()
-                    # 增加 JSON 解码错误捕获
-                    try:
-                        data = await response.json()
-                    except json.JSONDecodeError:
-                        text = await response.text()
-                        logger.error(
-                            f"[{self.name}] API 返回了非 JSON 内容: {text[:200]}..."
-                        )
-                        data = {}  # 避免后续引用 data 出错
-
-                    if "error" in data:
-                        error_msg = data.get("error", {}).get("message", "未知API错误")
-                        status_code = data.get("error", {}).get("code", "N/A")
-                        logger.error(
-                            f"[{self.name}] Google API 返回错误 (Code {status_code}): {error_msg}"
-                        )
-                        # 如果是配额用尽等错误, 应该直接返回, 不再继续处理
-                        # return ...
-
-                    # --- 修改: 增加 int 转换的异常捕获 ---
-                    try:
-                        if (
-                            "searchInformation" in data
-                            and "totalResults" in data["searchInformation"]
-                        ):
-                            # totalResults 是字符串 "123000"
-                            total_str = data["searchInformation"]["totalResults"]
-                            estimated_total = int(total_str) if total_str else 0
-                    except (ValueError, TypeError) as e:
-                        logger.warning(
-                            f"[{self.name}] 无法解析 'totalResults': {data.get('searchInformation', {}).get('totalResults')}, 错误: {e}"
-                        )
-                        estimated_total = None  # 确保是 None
-                    # ------------------------------------
-
-                    for item in data.get("items", []):
-                        # 达到所需数量时可以提前停止 (API num参数已限制，此处非必需但可作为防御)
-                        if len(results_list) >= search_query.count:
-                            break
-                        try:
-                            result_item = SearchResultItem(
-                                title=item.get("title", "无标题"),
-                                link=item.get("link", ""),
-                                snippet=item.get("snippet", "无摘要"),
-                            )
-                            results_list.append(result_item)
-                        except ValidationError as e:
-                            logger.warning(
-                                f"[{self.name}] 过滤掉一条来自API的无效结果。Link: {item.get('link')}, 错误: {e}"
-                            )
-
-            # --- 新增: 捕获超时和 HTTP 错误 ---
-            except asyncio.TimeoutError:
-                logger.error(
-                    f"[{self.name}] API 请求超时 ({REQUEST_TIMEOUT_SECONDS}s): {self.api_url}"
-                )
-            except ClientResponseError as e:
-                # e.g., 403 (key invalid/quota), 400 (bad request)
-                logger.error(
-                    f"[{self.name}] API 请求发生 HTTP 错误: 状态码={e.status}, 信息={e.message}"
-                )
-            # --------------------------------
-            except ClientError as e:  # ClientError
-                logger.error(f"[{self.name}] 请求API时发生网络错误: {e}")
-            except Exception as e:
-                logger.error(
-                    f"[{self.name}] 处理API响应时发生未知错误: {e}", exc_info=True
+        # API 单次最多返回 10 条 (num<=10)，需要更多结果时按 start=1,11,21... 分页，
+        # 并发请求所有分页，总耗时约为一次往返而不是 N 次
+        count = search_query.count
+        page_starts = range(1, count + 1, MAX_RESULTS_PER_REQUEST)
+        pages = await asyncio.gather(
+            *(
+                self._fetch_page(
+                    search_query.query,
+                    start,
+                    min(MAX_RESULTS_PER_REQUEST, count - start + 1),
                 )
+                for start in page_starts
+            )
+        )
 
-        end_time = time.time()
+        results_list = []
+        seen_links = set()
+        estimated_total = None
+        all_pages_ok = True
+        for page_ok, items, page_total in pages:
+            all_pages_ok = all_pages_ok and page_ok
+            if estimated_total is None:
+                estimated_total = page_total
+            for item in items:
+                # 达到所需数量时可以提前停止 (API num参数已限制，此处非必需但可作为防御)
+                if len(results_list) >= count:
+                    break
+                # 缺少链接的条目必然无法通过校验，先行跳过以省去模型构造开销
+                link = item.get("link")
+                if not link or link in seen_links:
+                    continue
+                try:
+                    result_item = SearchResultItem(
+                        title=item.get("title", "无标题"),
+                        link=link,
+                        snippet=item.get("snippet", "无摘要"),
+                    )
+                    results_list.append(result_item)
+                    seen_links.add(link)
+                except ValidationError as e:
+                    logger.warning(
+                        f"[{self.name}] 过滤掉一条来自API的无效结果。Link: {link}, 错误: {e}"
+                    )
+
+        # 只缓存所有分页都成功返回的完整结果；任一分页失败或 API 返回错误时
+        # 结果可能不完整，缓存它会在整个有效期内持续返回残缺的结果
+        if results_list and all_pages_ok:
+            self._set_cached(cache_key, results_list, estimated_total)
+
+        elapsed = round(time.perf_counter() - start_time, 4)
+        logger.info(
+            f"[{self.name}] 搜索完成, {len(page_starts)} 个分页共找到 {len(results_list)} 条结果, 耗时 {elapsed} 秒"
+        )
         return SearchResponse(
             query=search_query,
             engine_name=self.name,
             results=results_list,
-            search_time_seconds=round(end_time - start_time, 4),
+            search_time_seconds=elapsed,
             estimated_total_results=estimated_total,
         )
+
+    async def _fetch_page(
+        self, query: str, start: int, num: int
+    ) -> Tuple[bool, List[Dict[str, Any]], Optional[int]]:
+        """
+        请求一页搜索结果。
+        :return: (是否成功, 原始结果条目列表, 估算总结果数)。
+                 请求失败、响应无法解析或 API 返回错误时返回 (False, [], None)。
+        """
+        params = dict(self._base_params_items, q=query, num=num, start=start)
+        estimated_total = None
+
+        # 每个分页都消耗一次配额，逐页限速
+        await self.wait_for_rate_limit()
+        # 复用引擎级别的长连接会话
+        session = await self._get_session()
+        try:
+            async with session.get(self.api_url, params=params) as response:
+                # 检查状态码，对于API，非200都应视为错误
+                response.raise_for_status()
+                # 增加 JSON 解码错误捕获
+                body = await response.read()
+                try:
+                    data = json_loads(body)
+                except ValueError:
+                    # 只解码前 200 字节用于日志，避免对整个响应体做文本解码
+                    preview = body[:200].decode("utf-8", errors="replace")
+                    logger.error(
+                        f"[{self.name}] API 返回了非 JSON 内容: {preview}..."
+                    )
+                    return False, [], None
+
+                error = data.get("error")
+                if error is not None:
+                    error_msg = error.get("message", "未知API错误")
+                    status_code = error.get("code", "N/A")
+                    logger.error(
+                        f"[{self.name}] Google API 返回错误 (Code {status_code}): {error_msg}"
+                    )
+                    # 配额用尽等错误, 直接返回, 不再继续处理
+                    return False, [], None
+
+                # --- 修改: 增加 int 转换的异常捕获 ---
+                search_info = data.get("searchInformation")
+                total_str = search_info.get("totalResults") if search_info else None
+                try:
+                    if total_str is not None:
+                        # totalResults 是字符串 "123000"
+                        estimated_total = int(total_str) if total_str else 0
+                except (ValueError, TypeError) as e:
+                    logger.warning(
+                        f"[{self.name}] 无法解析 'totalResults': {total_str}, 错误: {e}"
+                    )
+                    estimated_total = None  # 确保是 None
+                # ------------------------------------
+
+                return True, data.get("items", []), estimated_total
+
+        # --- 新增: 捕获超时和 HTTP 错误 ---
+        except asyncio.TimeoutError:
+            logger.error(
+                f"[{self.name}] API 请求超时 ({REQUEST_TIMEOUT_SECONDS}s): {self.api_url}"
+            )
+        except ClientResponseError as e:
+            # e.g., 403 (key invalid/quota), 400 (bad request)
+            logger.error(
+                f"[{self.name}] API 请求发生 HTTP 错误: 状态码={e.status}, 信息={e.message}"
+            )
+        # --------------------------------
+        except ClientError as e:  # ClientError
+            logger.error(f"[{self.name}] 请求API时发生网络错误: {e}")
+        except Exception as e:
+            logger.error(
+                f"[{self.name}] 处理API响应时发生未知错误: {e}", exc_info=True
+            )
+        return False, [], None
+
+    def _get_cached(
+        self, key: Tuple[str, int]
+    ) -> Optional[Tuple[List[SearchResultItem], Optional[int]]]:
+        """读取未过期的缓存结果，过期条目会被顺带删除。"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, results, total = entry
+        if time.monotonic() >= expires_at:
+            del self._cache[key]
+            return None
+        return results, total
+
+    def _set_cached(
+        self,
+        key: Tuple[str, int],
+        results: List[SearchResultItem],
+        total: Optional[int],
+    ):
+        """写入缓存，超出容量时淘汰最早写入的条目。"""
+        if self.cache_ttl <= 0:
+            return
+        if key not in self._cache and len(self._cache) >= self.cache_max_size:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = (time.monotonic() + self.cache_ttl, list(results), total)
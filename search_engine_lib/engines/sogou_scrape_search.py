@@ -1,11 +1,12 @@
 # coding: utf-8
 import time
 import asyncio
+import logging
 from typing import Dict, Any
+from types import MappingProxyType
 from urllib.parse import quote_plus
 
-import aiohttp
-from aiohttp import ClientError, ClientResponseError, ClientTimeout
+from aiohttp import ClientError, ClientResponseError
 from bs4 import BeautifulSoup
 from pydantic import ValidationError
 
@@ -15,13 +16,26 @@ from ..models import SearchQuery, SearchResultItem, SearchResponse
 from astrbot.api import logger
 from ...core.constants import REQUEST_TIMEOUT_SECONDS
 
-# 超时配置
-TIMEOUT_CONFIG = ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
+# 请求头不随查询变化，模块加载时构造一次，并设为只读防止被意外修改
+HEADERS = MappingProxyType(
+    {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
+        "Cache-Control": "no-cache",
+        "Pragma": "no-cache",
+        "Referer": "https://www.sogou.com/",
+    }
+)
+
 
 @register_engine
 class SogouScrapeSearch(BaseSearchEngine):
     """通过模拟浏览器请求并抓取搜狗搜索页面来进行搜索的引擎。"""
 
+    # 抓取类引擎并发过高容易触发验证码或封禁
+    max_concurrent_requests = 4
+
     @property
     def name(self) -> str:
         return "sogou_scrape"
@@ -38,126 +52,118 @@ class SogouScrapeSearch(BaseSearchEngine):
         return True
 
     async def search(self, search_query: SearchQuery) -> SearchResponse:
-        start_time = time.time()
+        start_time = time.perf_counter()
         search_url = f"https://www.sogou.com/web?query={quote_plus(search_query.query)}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-            "Cache-Control": "no-cache",
-            "Pragma": "no-cache",
-            "Referer": "https://www.sogou.com/",
-        }
         logger.info(
             f"[{self.name}] 正在抓取URL: {search_url} (Timeout={REQUEST_TIMEOUT_SECONDS}s)"
         )
         results_list = []
 
-        async with aiohttp.ClientSession(
-            headers=headers, timeout=TIMEOUT_CONFIG
-        ) as session:
-            try:
-                async with session.get(search_url) as response:
-                    response.raise_for_status()
-                    html = await response.text()
-                    soup = BeautifulSoup(html, "html.parser")
+        await self.wait_for_rate_limit()
+        session = await self._get_session()
+        try:
+            async with session.get(search_url, headers=HEADERS) as response:
+                response.raise_for_status()
+                html = await response.text()
+                soup = BeautifulSoup(html, "html.parser")
 
-                    # 搜狗搜索结果解析
-                    found_results = False
+                # 搜狗搜索结果解析
+                found_results = False
                     
-                    # 搜狗搜索结果的可能选择器
-                    selectors_to_try = [
-                        # 标准搜狗结构
-                        (".results .result", "h3 a", ".str_info"),
-                        (".results .result", "h3 a", ".space"),
-                        # 备用结构
-                        (".result", "h3 a", ".str_info"),
-                        (".result", ".result-title a", ".result-desc"),
-                        # 更通用的结构
-                        ("div[class*='result']", "a[href]", ""),
-                    ]
+                # 搜狗搜索结果的可能选择器
+                selectors_to_try = [
+                    # 标准搜狗结构
+                    (".results .result", "h3 a", ".str_info"),
+                    (".results .result", "h3 a", ".space"),
+                    # 备用结构
+                    (".result", "h3 a", ".str_info"),
+                    (".result", ".result-title a", ".result-desc"),
+                    # 更通用的结构
+                    ("div[class*='result']", "a[href]", ""),
+                ]
                     
-                    for container_selector, title_selector, snippet_selector in selectors_to_try:
-                        if found_results:
-                            break
+                for container_selector, title_selector, snippet_selector in selectors_to_try:
+                    if found_results:
+                        break
                             
-                        containers = soup.select(container_selector)
-                        logger.debug(f"[{self.name}] 尝试选择器 '{container_selector}', 找到 {len(containers)} 个容器")
+                    containers = soup.select(container_selector)
+                    logger.debug(f"[{self.name}] 尝试选择器 '{container_selector}', 找到 {len(containers)} 个容器")
                         
-                        for container in containers:
-                            if len(results_list) >= search_query.count:
-                                break
+                    for container in containers:
+                        if len(results_list) >= search_query.count:
+                            break
                             
-                            # 查找标题链接
-                            title_tag = container.select_one(title_selector)
-                            if not title_tag:
-                                continue
+                        # 查找标题链接
+                        title_tag = container.select_one(title_selector)
+                        if not title_tag:
+                            continue
                             
-                            title_text = title_tag.get_text(strip=True)
-                            link_url = title_tag.get("href")
+                        title_text = title_tag.get_text(strip=True)
+                        link_url = title_tag.get("href")
                             
-                            if not title_text or not link_url:
-                                continue
+                        if not title_text or not link_url:
+                            continue
                             
-                            # 处理相对URL
-                            if link_url.startswith("/"):
-                                link_url = "https://www.sogou.com" + link_url
+                        # 处理相对URL
+                        if link_url.startswith("/"):
+                            link_url = "https://www.sogou.com" + link_url
                             
-                            # 查找描述
-                            snippet_text = "无描述"
-                            if snippet_selector:
-                                snippet_elem = container.select_one(snippet_selector)
-                                if snippet_elem:
-                                    snippet_text = snippet_elem.get_text(strip=True)
+                        # 查找描述
+                        snippet_text = "无描述"
+                        if snippet_selector:
+                            snippet_elem = container.select_one(snippet_selector)
+                            if snippet_elem:
+                                snippet_text = snippet_elem.get_text(strip=True)
                             
-                            if snippet_text == "无描述":
-                                # 备用方案：获取容器内所有文本
-                                all_text = container.get_text(strip=True)
-                                snippet_text = all_text.replace(title_text, "").strip()
-                                if len(snippet_text) > 200:
-                                    snippet_text = snippet_text[:200] + "..."
-                                if not snippet_text or len(snippet_text) < 10:
-                                    snippet_text = "无描述"
+                        if snippet_text == "无描述":
+                            # 备用方案：获取容器内所有文本
+                            all_text = container.get_text(strip=True)
+                            snippet_text = all_text.replace(title_text, "").strip()
+                            if len(snippet_text) > 200:
+                                snippet_text = snippet_text[:200] + "..."
+                            if not snippet_text or len(snippet_text) < 10:
+                                snippet_text = "无描述"
                             
-                            try:
-                                result_item = SearchResultItem(
-                                    title=title_text,
-                                    link=link_url,
-                                    snippet=snippet_text,
-                                )
-                                results_list.append(result_item)
-                                found_results = True
-                                logger.debug(f"[{self.name}] 成功解析结果: {title_text}")
-                            except ValidationError as e:
-                                logger.warning(f"[{self.name}] 过滤掉一条解析出的无效结果。URL: {link_url}, 错误: {e}")
+                        try:
+                            result_item = SearchResultItem(
+                                title=title_text,
+                                link=link_url,
+                                snippet=snippet_text,
+                            )
+                            results_list.append(result_item)
+                            found_results = True
+                            logger.debug(f"[{self.name}] 成功解析结果: {title_text}")
+                        except ValidationError as e:
+                            logger.warning(f"[{self.name}] 过滤掉一条解析出的无效结果。URL: {link_url}, 错误: {e}")
                     
-                    if not found_results:
-                        logger.warning(f"[{self.name}] 未找到任何搜索结果，可能页面结构已变化")
+                if not found_results:
+                    logger.warning(f"[{self.name}] 未找到任何搜索结果，可能页面结构已变化")
+                    if logger.isEnabledFor(logging.DEBUG):
                         logger.debug(f"[{self.name}] 页面HTML前1000字符: {html[:1000]}")
 
-            except asyncio.TimeoutError:
-                logger.error(
-                    f"[{self.name}] 抓取超时 ({REQUEST_TIMEOUT_SECONDS}s): {search_url}"
-                )
-            except ClientResponseError as e:
-                logger.error(
-                    f"[{self.name}] 抓取时发生 HTTP 错误: 状态码={e.status}, 信息={e.message}, URL={search_url}"
-                )
-            except ClientError as e:
-                logger.error(f"[{self.name}] 抓取时发生网络错误: {e}")
-            except Exception as e:
-                logger.error(
-                    f"[{self.name}] 解析HTML时发生未知错误: {e}", exc_info=True
-                )
+        except asyncio.TimeoutError:
+            logger.error(
+                f"[{self.name}] 抓取超时 ({REQUEST_TIMEOUT_SECONDS}s): {search_url}"
+            )
+        except ClientResponseError as e:
+            logger.error(
+                f"[{self.name}] 抓取时发生 HTTP 错误: 状态码={e.status}, 信息={e.message}, URL={search_url}"
+            )
+        except ClientError as e:
+            logger.error(f"[{self.name}] 抓取时发生网络错误: {e}")
+        except Exception as e:
+            logger.error(
+                f"[{self.name}] 解析HTML时发生未知错误: {e}", exc_info=True
+            )
 
-        end_time = time.time()
+        elapsed = round(time.perf_counter() - start_time, 4)
         logger.info(
-            f"[{self.name}] 抓取完成, 共找到 {len(results_list)} 条结果, 耗时 {round(end_time - start_time, 4)} 秒"
+            f"[{self.name}] 抓取完成, 共找到 {len(results_list)} 条结果, 耗时 {elapsed} 秒"
         )
         return SearchResponse(
             query=search_query,
             engine_name=self.name,
             results=results_list,
-            search_time_seconds=round(end_time - start_time, 4),
+            search_time_seconds=elapsed,
             estimated_total_results=None,
         )
@@ -2,6 +2,7 @@
 """URL解析器基类"""
 
 import re
+from urllib.parse import urljoin
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any
 import httpx
@@ -82,8 +83,6 @@ class BaseURLResolver(ABC):
                 if location:
                     # 处理相对URL
                     if location.startswith("/"):
-                        from urllib.parse import urljoin
-
                         location = urljoin(url, location)
                     logger.info(f"[{self.name}] HTTP重定向解析: {url} -> {location}")
                     return location
@@ -2,6 +2,7 @@
 """具体的URL解析器实现"""
 
 import re
+import base64
 from urllib.parse import unquote, parse_qs, urlparse
 from typing import Optional
 import httpx
@@ -89,8 +90,6 @@ class BingRedirectResolver(BaseURLResolver):
             if match:
                 encoded_url = match.group(1)
                 # Bing使用base64编码
-                import base64
-
                 try:
                     decoded = base64.b64decode(encoded_url + "===").decode("utf-8")
                     return decoded